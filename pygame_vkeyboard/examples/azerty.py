@@ -36,14 +36,18 @@ def main(test=False):
     while True:
         clock.tick(100)  # Ensure not exceed 100 FPS
 
-        for event in pygame.event.get():
-            keyboard.on_event(event)
+        events = pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 print("Average FPS: ", clock.get_fps())
                 exit()
 
-        # Flip the entire surface
-        pygame.display.flip()
+        keyboard.update(events)
+        rects = keyboard.draw(screen)
+
+        # Flip only the updated area
+        pygame.display.update(rects)
 
         # At first loop returns
         if test:
@@ -41,7 +41,12 @@ def main(test=False):
     # Main loop
     while True:
 
+        # Sleep until an event arrives instead of spinning at full
+        # speed, then drain whatever else is queued for this frame
+        event = pygame.event.wait(100)
         events = pygame.event.get()
+        if event.type != pygame.NOEVENT:
+            events.insert(0, event)
 
         for event in events:
             if event.type == pygame.QUIT:
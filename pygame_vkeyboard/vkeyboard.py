@@ -26,6 +26,9 @@ keyboard.enable()
 """
 
 import logging
+from bisect import bisect_right
+from collections import deque
+
 import pygame  # pylint: disable=import-error
 
 from . import vkeys
@@ -35,6 +38,19 @@ from .vtextinput import VTextInput, VBackground
 
 LOGGER = logging.getLogger(__name__)
 
+# Event types processed by the keyboard and its keys, everything
+# else is filtered out before being fanned out to the key sprites.
+EVENT_TYPES = frozenset((
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.FINGERDOWN,
+    pygame.FINGERUP,
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.JOYHATMOTION,
+    pygame.JOYBUTTONDOWN,
+    pygame.JOYBUTTONUP))
+
 # Joystick controls
 JOYHAT_UP = (0, 1)
 JOYHAT_LEFT = (-1, 0)
@@ -86,12 +102,21 @@ class VKeyRow(object):
     checking row collision, then internal row key detection.
     """
 
+    __slots__ = ('keys', 'height', 'position', 'space',
+                 '_x0', '_x1', '_y0', '_y1')
+
     def __init__(self):
         """Default row constructor. """
-        self.keys = []
+        self.keys = deque()
         self.height = 0
         self.position = (0, 0)
         self.space = None
+        # Parallel arrays of keys horizontal bounds and row vertical
+        # band, rebuilt by set_size() and used for fast hit-testing.
+        self._x0 = ()
+        self._x1 = ()
+        self._y0 = 0
+        self._y1 = 0
 
     def add_key(self, key, first=False):
         """Adds the given key to this row.
@@ -104,7 +129,7 @@ class VKeyRow(object):
             Flag that indicates if key is added at the beginning or at the end.
         """
         if first:
-            self.keys = [key] + self.keys
+            self.keys.appendleft(key)
         else:
             self.keys.append(key)
         if isinstance(key, vkeys.VSpaceKey):
@@ -127,11 +152,48 @@ class VKeyRow(object):
         """
         self.height = size
         self.position = position
-        x = position[0]
+        x, y = position
+        # All keys but the space bar share the same width, so the
+        # horizontal step is a constant instead of a per-key rect read.
+        step = padding + size
         for key in self.keys:
             key.set_size(size, size)
-            key.set_position(x, position[1])
-            x += padding + key.rect.width
+            key.set_position(x, y)
+            if key is self.space:
+                x += padding + key.rect.width
+            else:
+                x += step
+        self._x0 = tuple(key.rect.x for key in self.keys)
+        self._x1 = tuple(key.rect.right for key in self.keys)
+        self._y0 = y
+        self._y1 = y + size
+
+    def get_key_at(self, position):
+        """Retrieve if any key of this row is located at the given position.
+
+        The vertical band of the row is checked first, then the key
+        bounds are probed using the cached parallel arrays to avoid
+        per-key attribute accesses.
+
+        Parameters
+        ----------
+        position:
+            Position to check key at.
+
+        Returns
+        -------
+        key:
+            The located key if any at the given position, None otherwise.
+        """
+        if not self._y0 <= position[1] < self._y1:
+            return None
+        # Bounds are sorted left-to-right, locate the first key whose
+        # right edge is beyond x then check its left edge.
+        x = position[0]
+        i = bisect_right(self._x1, x)
+        if i < len(self.keys) and self._x0[i] <= x:
+            return self.keys[i]
+        return None
 
     def __len__(self):
         """len() operator overload.
@@ -161,6 +223,13 @@ class VKeyboardLayout(object):
     Pressing this key will switch the associated keyboard current layout.
     """
 
+    __slots__ = ('position', 'size', 'rows', 'keys', 'sprites', 'padding',
+                 'height_ratio', 'selection', 'uppercase', 'allow_space',
+                 'allow_uppercase', 'allow_special_chars',
+                 'special_keys_configured', 'max_length', 'key_map',
+                 '_key_size', '_key_size_computed', '_row_y1',
+                 '_key_indexes', '_last_key')
+
     # AZERTY Layout.
     AZERTY = ['1234567890', 'azertyuiop', 'qsdfghjklm', 'wxcvbn']
 
@@ -209,28 +278,39 @@ class VKeyboardLayout(object):
         self.position = None
         self.size = None
         self.rows = []
+        self.keys = []
         self.sprites = pygame.sprite.LayeredDirty()
         self.padding = padding
         self.height_ratio = height_ratio
         self.selection = None
+        self.uppercase = False
         self.allow_space = allow_space
         self.allow_uppercase = allow_uppercase
         self.allow_special_chars = allow_special_chars
+        self.special_keys_configured = False
+        self.max_length = 0
         for model_row in model:
             row = VKeyRow()
             for value in model_row:
                 key = vkeys.VKey(value)
                 row.add_key(key)
+                self.keys.append(key)
                 self.sprites.add(key, layer=1)
             self.rows.append(row)
-        self.max_length = len(max(self.rows, key=len))
+            if len(row) > self.max_length:
+                self.max_length = len(row)
         if self.max_length == 0:
             raise ValueError('Empty layout model provided')
+        self.key_map = {}
+        self.build_key_map()
         if height_ratio is not None and (height_ratio < 0.2 or height_ratio > 1):
             raise ValueError('Surface height ratio shall be from 0.2 to 1')
 
         self._key_size = key_size
         self._key_size_computed = None
+        self._row_y1 = ()
+        self._key_indexes = {}
+        self._last_key = None
 
     @property
     def key_size(self):
@@ -240,6 +320,22 @@ class VKeyboardLayout(object):
     def key_size(self, key_size):
         self._key_size = key_size
 
+    def build_key_map(self):
+        """Rebuild the value to key index used by get_key().
+
+        The first key found for a given value wins, mirroring the
+        previous linear scan behavior.
+        """
+        self.key_map = {}
+        for key in self.keys:
+            self.key_map.setdefault(key.value, key)
+
+    def update_action_keys(self):
+        """Sync the action keys activated state with their holder."""
+        for key in self.keys:
+            if isinstance(key, vkeys.VActionKey):
+                key.update_activated()
+
     def hide(self):
         """Hide all keys."""
         for sprite in self.sprites:
@@ -258,7 +354,7 @@ class VKeyboardLayout(object):
         renderer:
             Renderer instance this layout uses.
         """
-        for key in self.sprites.get_sprites_from_layer(1):
+        for key in self.keys:
             key.renderer = renderer
 
     def configure_special_keys(self, keyboard):
@@ -269,6 +365,11 @@ class VKeyboardLayout(object):
         keyboard:
             Keyboard instance this layout belong.
         """
+        if self.special_keys_configured:
+            # Layout is shared or reused, special keys are already
+            # dispatched in the rows, do not insert them twice.
+            return
+        self.special_keys_configured = True
         special_row = VKeyRow()
         max_length = self.max_length
         i = len(self.rows) - 1
@@ -282,6 +383,7 @@ class VKeyboardLayout(object):
         if self.allow_special_chars:
             special_keys.append(
                 vkeys.VSpecialCharKey(keyboard.on_special_char, keyboard))
+        self.keys.extend(special_keys)
         self.sprites.add(*special_keys, layer=1)
 
         # Dispatch special keys in the layout
@@ -298,6 +400,7 @@ class VKeyboardLayout(object):
         if self.allow_space:
             space_length = len(current_row) - len(special_keys)
             special_row.add_key(vkeys.VSpaceKey(space_length))
+            self.keys.append(special_row.space)
             self.sprites.add(special_row.space, layer=1)
         first = True
 
@@ -308,6 +411,8 @@ class VKeyboardLayout(object):
 
         if special_row:
             self.rows.append(special_row)
+        self.build_key_map()
+        self._key_indexes = {}
 
     def configure_bound(self, surface_size):
         """Compute keyboard bound regarding of this layout. If `key_size` is
@@ -318,23 +423,28 @@ class VKeyboardLayout(object):
         surface_size:
             Size of the surface this layout will be rendered on.
         """
+        # Bind attributes to locals, this method is re-evaluated on
+        # every window resize.
+        padding = self.padding
+        max_length = self.max_length
+        ratio = self.height_ratio
         nb_rows = len(self.rows)
         if self._key_size is None:
-            self._key_size_computed = int(
-                (surface_size[0] - (self.padding * (self.max_length + 1)))
-                / self.max_length)
-
-        height = self.key_size * nb_rows + self.padding * (nb_rows + 1)
-        if height > surface_size[1] * (self.height_ratio or 0.5):
-            self._key_size_computed = int((surface_size[1] * (self.height_ratio or 0.5)
-                                           - (self.padding * (nb_rows + 1))) / nb_rows)
-            height = self.key_size * nb_rows + self.padding * (nb_rows + 1)
+            self._key_size_computed = (
+                (surface_size[0] - (padding * (max_length + 1)))
+                // max_length)
+
+        height = self.key_size * nb_rows + padding * (nb_rows + 1)
+        if height > surface_size[1] * (ratio or 0.5):
+            self._key_size_computed = int(surface_size[1] * (ratio or 0.5)
+                                          - (padding * (nb_rows + 1))) // nb_rows
+            height = self.key_size * nb_rows + padding * (nb_rows + 1)
             if self._key_size:
                 self._key_size = self._key_size_computed
                 LOGGER.warning('Computed layout height outbound target surface,'
                                ' reducing key_size to %spx', self.key_size)
-        elif self.height_ratio is not None:
-            height = surface_size[1] * self.height_ratio
+        elif ratio is not None:
+            height = surface_size[1] * ratio
         self.set_size((surface_size[0], int(height)), surface_size)
 
     def set_size(self, size, surface_size):
@@ -351,17 +461,21 @@ class VKeyboardLayout(object):
         self.size = size
         self.position = (0, surface_size[1] - self.size[1])
 
-        y = self.position[1] + (self.size[1] - len(self.rows) * self.key_size
-                                - (len(self.rows) + 1) * self.padding) // 2
-        y += self.padding
+        padding = self.padding
+        key_size = self.key_size
+        nb_rows = len(self.rows)
+        y = self.position[1] + (self.size[1] - nb_rows * key_size
+                                - (nb_rows + 1) * padding) // 2
+        y += padding
         for row in self.rows:
             nb_keys = len(row)
-            width = (nb_keys * self.key_size) + ((nb_keys + 1) * self.padding)
-            x = (surface_size[0] - width) // 2 + self.padding
+            width = (nb_keys * key_size) + ((nb_keys + 1) * padding)
+            x = (surface_size[0] - width) // 2 + padding
             if row.space:
-                x -= ((row.space.length - 1) * self.key_size) / 2
-            row.set_size((x, y), self.key_size, self.padding)
-            y += self.padding + self.key_size
+                x -= ((row.space.length - 1) * key_size) // 2
+            row.set_size((x, y), key_size, padding)
+            y += padding + key_size
+        self._row_y1 = tuple(row._y1 for row in self.rows)
 
     def set_uppercase(self, uppercase):
         """Sets layout uppercase state.
@@ -371,8 +485,12 @@ class VKeyboardLayout(object):
         uppercase:
             True if uppercase, False otherwise.
         """
-        for key in self.sprites.get_sprites_from_layer(1):
+        if uppercase == self.uppercase:
+            return
+        self.uppercase = uppercase
+        for key in self.keys:
             key.set_uppercase(uppercase)
+        self.build_key_map()
 
     def get_key(self, value):
         """Retrieve if any key with the given value
@@ -387,10 +505,7 @@ class VKeyboardLayout(object):
         key:
             The located key if any with the given value, None otherwise.
         """
-        for key in self.sprites.get_sprites_from_layer(1):
-            if key.value == value:
-                return key
-        return None
+        return self.key_map.get(value)
 
     def get_key_at(self, position):
         """Retrieve if any key is located at the given position
@@ -405,9 +520,19 @@ class VKeyboardLayout(object):
         key:
             The located key if any at the given position, None otherwise.
         """
-        for sprite in self.sprites.get_sprites_at(position):
-            if isinstance(sprite, vkeys.VKey):
-                return sprite
+        # Consecutive pointer events tend to land on the same key,
+        # probe the last hit before searching (rects never overlap).
+        key = self._last_key
+        if key is not None and key.rect.collidepoint(position):
+            return key
+        # Rows are stacked top-to-bottom, bisect their sorted bottom
+        # bounds to find the only candidate row.
+        i = bisect_right(self._row_y1, position[1])
+        if i < len(self.rows):
+            key = self.rows[i].get_key_at(position)
+            if key is not None:
+                self._last_key = key
+            return key
         return None
 
     def get_key_closest(self, key, loop_row=True, loop_col=True):
@@ -437,22 +562,30 @@ class VKeyboardLayout(object):
         keys_dict = {center: key,
                      left: None, top: None, right: None, bottom: None}
 
-        for row_index, r in enumerate(self.rows):
-            for key_index, k in enumerate(r.keys):
-                if key == k:
-                    if key_index - 1 >= 0 or loop_row:
-                        keys_dict[left] = r.keys[(key_index - 1) % len(r.keys)]
-                    if key_index + 1 < len(r.keys) or loop_row:
-                        keys_dict[right] = r.keys[(key_index + 1) % len(r.keys)]
-
-                    if row_index - 1 >= 0 or loop_col:
-                        prev_row = self.rows[(row_index - 1) % len(self.rows)]
-                        keys_dict[top] = prev_row\
-                            .keys[min(key_index, len(prev_row) - 1)]
-                    if row_index + 1 < len(self.rows) or loop_col:
-                        next_row = self.rows[(row_index + 1) % len(self.rows)]
-                        keys_dict[bottom] = next_row\
-                            .keys[min(key_index, len(next_row) - 1)]
+        indexes = self._key_indexes
+        if not indexes:
+            # Lazily index keys by grid position, rows are stable
+            # once the special keys have been dispatched.
+            for row_index, row in enumerate(self.rows):
+                for key_index, k in enumerate(row.keys):
+                    indexes[k] = (row_index, key_index)
+
+        if key in indexes:
+            row_index, key_index = indexes[key]
+            row = self.rows[row_index]
+            if key_index - 1 >= 0 or loop_row:
+                keys_dict[left] = row.keys[(key_index - 1) % len(row.keys)]
+            if key_index + 1 < len(row.keys) or loop_row:
+                keys_dict[right] = row.keys[(key_index + 1) % len(row.keys)]
+
+            if row_index - 1 >= 0 or loop_col:
+                prev_row = self.rows[(row_index - 1) % len(self.rows)]
+                keys_dict[top] = prev_row\
+                    .keys[min(key_index, len(prev_row) - 1)]
+            if row_index + 1 < len(self.rows) or loop_col:
+                next_row = self.rows[(row_index + 1) % len(self.rows)]
+                keys_dict[bottom] = next_row\
+                    .keys[min(key_index, len(next_row) - 1)]
         return keys_dict
 
 
@@ -503,10 +636,34 @@ class VKeyboard(object):
         self.special_char = False
         self.joystick_navigation = joystick_navigation
 
-        # Setup background as a DirtySprite
+        # Keys currently pressed, tracked per input source so each
+        # release event only touches the key it pressed.
+        self.pressed_by_mouse = {}
+        self.pressed_by_finger = {}
+        self.pressed_by_scancode = {}
+
+        # Event dispatch table, O(1) lookup instead of an if/elif
+        # chain over the event type.
+        self.event_handlers = {
+            pygame.MOUSEBUTTONDOWN: self.on_mouse_down,
+            pygame.MOUSEBUTTONUP: self.on_mouse_up,
+            pygame.FINGERDOWN: self.on_finger_down,
+            pygame.FINGERUP: self.on_finger_up,
+            pygame.KEYDOWN: self.on_scancode_down,
+            pygame.KEYUP: self.on_scancode_up,
+            pygame.JOYHATMOTION: self.on_joyhat,
+            pygame.JOYBUTTONDOWN: self.on_joybutton_down,
+            pygame.JOYBUTTONUP: self.on_joybutton_up,
+        }
+
+        # Setup background as a DirtySprite in its own group, shared
+        # by all layouts to avoid double dirty-tracking of the same
+        # sprite on each draw.
         self.eraser = None
+        self.panel_eraser = None
         self.background = VBackground(self.surface.get_rect().size,
                                       self.renderer)
+        self.background_group = pygame.sprite.LayeredDirty(self.background)
 
         # Setup the layouts
         self.layout = main_layout
@@ -526,7 +683,6 @@ class VKeyboard(object):
         for layout in self.layouts:
             layout.configure_special_keys(self)
             layout.configure_renderer(self.renderer)
-            layout.sprites.add(self.background, layer=0)
 
         # Setup the text input box
         self.show_text = show_text
@@ -556,13 +712,26 @@ class VKeyboard(object):
         self.layout.hide()
         self.layout = layout
         self.layout.show()
+        # The outgoing layout group is no longer drawn, so its keys
+        # are never erased: repaint the whole panel area through the
+        # incoming group (its eraser holds the composited background).
+        self.layout.sprites.repaint_rect(self.background.rect)
 
     def set_eraser(self, surface):
         """Setup the surface used to hide/clear the keyboard.
         """
         self.eraser = surface.copy()
+        self.background_group.clear(surface, self.eraser)
+        # While shown, layout sprites must erase against the
+        # composited panel, not the raw application surface,
+        # otherwise clearing a key would punch a hole in the
+        # background. While hidden, keys erase back to the
+        # application surface like the panel itself.
+        self.panel_eraser = self.eraser.copy()
+        self.panel_eraser.blit(self.background.image, self.background.rect)
+        layout_eraser = self.panel_eraser if self.state == 1 else self.eraser
         for layout in self.layouts:
-            layout.sprites.clear(surface, self.eraser)
+            layout.sprites.clear(surface, layout_eraser)
 
     def set_size(self, width, height):
         """Resize the keyboard according to the surface size and the parameters
@@ -578,6 +747,8 @@ class VKeyboard(object):
         synchronize_layouts((width, height), *self.layouts)
         self.background.set_rect(*self.layout.position + self.layout.size)
 
+        if self.background_group.get_clip() != self.background.rect:
+            self.background_group.set_clip(self.background.rect)
         for layout in self.layouts:
             if layout.sprites.get_clip() != self.background.rect:
                 # Changing the clipping area will force update of all
@@ -606,7 +777,11 @@ class VKeyboard(object):
     def enable(self):
         """Set this keyboard as active."""
         self.state = 1
+        self.background.visible = 1
         self.layout.show()
+        if self.eraser:
+            for layout in self.layouts:
+                layout.sprites.clear(self.surface, self.panel_eraser)
         if self.show_text:
             self.input.enable()
 
@@ -617,8 +792,14 @@ class VKeyboard(object):
     def disable(self):
         """Set this keyboard as non active."""
         self.state = 0
+        self.background.visible = 0
         self.layout.hide()
         self.input.disable()
+        if self.eraser:
+            # Hidden keys must blank to the application surface, not
+            # to the panel they normally sit on.
+            for layout in self.layouts:
+                layout.sprites.clear(self.surface, self.eraser)
 
     def get_rect(self):
         """Return keyboard rect."""
@@ -662,12 +843,15 @@ class VKeyboard(object):
         # Setup eraser
         if not self.eraser or force:
             self.set_eraser(surface)
+            # Repaint before drawing so the forced frame itself shows
+            # the full panel, not only the next one.
+            self.background.dirty = 1
+            self.background_group.repaint_rect(self.background.rect)
+            self.layout.sprites.repaint_rect(self.background.rect)
 
-        rects = self.layout.sprites.draw(surface)
+        rects = self.background_group.draw(surface)
+        rects += self.layout.sprites.draw(surface)
         rects += self.input.draw(surface, force)
-
-        if force:
-            self.layout.sprites.repaint_rect(self.background.rect)
         return rects
 
     def update(self, events):
@@ -679,65 +863,119 @@ class VKeyboard(object):
             List of events to process.
         """
         if self.state == 1:
-            self.layout.sprites.update(events)
+            events = [event for event in events
+                      if event.type in EVENT_TYPES]
             self.input.update(events)
 
+            handlers = self.event_handlers
             for event in events:
-                if event.type == pygame.MOUSEBUTTONDOWN\
-                        and event.button in (1, 2, 3):
-                    # Don't consider the mouse wheel (button 4 & 5)
-                    key = self.layout.get_key_at(event.pos)
-                    if key:
-                        self.on_key_down(key)
-                        self.on_select(0, 0, key)
-                    elif self.input.get_rect().collidepoint(event.pos)\
-                            and self.layout.selection:
-                        self.layout.selection.set_selected(0)
-                        self.layout.selection = None
-                        self.input.set_selected(1)
-                elif event.type == pygame.FINGERDOWN:
-                    display_size = pygame.display.get_surface().get_size()
-                    finger_pos = (event.x * display_size[0], event.y * display_size[1])
-                    key = self.layout.get_key_at(finger_pos)
-                    if key:
-                        self.on_key_down(key)
-                        self.on_select(0, 0, key)
-                    elif self.input.get_rect().collidepoint(finger_pos)\
-                            and self.layout.selection:
-                        self.layout.selection.set_selected(0)
-                        self.layout.selection = None
-                        self.input.set_selected(1)
-                elif event.type == pygame.KEYDOWN:
-                    key = self.layout.get_key(event.unicode or event.key)
-                    if key:
-                        self.on_key_down(key)
-                        self.on_select(0, 0, key)
-                    elif event.key == pygame.K_LEFT and not self.input.selected:
-                        self.on_select(0, -1)
-                    elif event.key == pygame.K_UP:
-                        self.on_select(-1, 0)
-                    elif event.key == pygame.K_RIGHT and\
-                            not self.input.selected:
-                        self.on_select(0, 1)
-                    elif event.key == pygame.K_DOWN:
-                        self.on_select(1, 0)
-                    elif event.key == pygame.K_RETURN and self.layout.selection:
-                        self.on_key_down(self.layout.selection)
-                elif event.type == pygame.JOYHATMOTION:
-                    if event.value == JOYHAT_LEFT and\
-                            not self.input.selected:
-                        self.on_select(0, -1)
-                    elif event.value == JOYHAT_UP:
-                        self.on_select(-1, 0)
-                    elif event.value == JOYHAT_RIGHT and\
-                            not self.input.selected:
-                        self.on_select(0, 1)
-                    elif event.value == JOYHAT_DOWN:
-                        self.on_select(1, 0)
-                elif event.type == pygame.JOYBUTTONDOWN\
-                        and event.button == 0 and self.layout.selection:
-                    # Select button pressed
-                    self.on_key_down(self.layout.selection)
+                handlers[event.type](event)
+
+    def on_mouse_down(self, event):
+        """MOUSEBUTTONDOWN event handler."""
+        if event.button in (1, 2, 3):
+            # Don't consider the mouse wheel (button 4 & 5)
+            key = self.on_pointer_down(event.pos)
+            if key:
+                self.pressed_by_mouse[event.button] = key
+
+    def on_mouse_up(self, event):
+        """MOUSEBUTTONUP event handler."""
+        key = self.pressed_by_mouse.pop(event.button, None)
+        if key:
+            key.set_pressed(0)
+
+    def on_finger_down(self, event):
+        """FINGERDOWN event handler."""
+        display_size = pygame.display.get_surface().get_size()
+        finger_pos = (event.x * display_size[0], event.y * display_size[1])
+        key = self.on_pointer_down(finger_pos)
+        if key:
+            self.pressed_by_finger[event.finger_id] = key
+
+    def on_finger_up(self, event):
+        """FINGERUP event handler."""
+        key = self.pressed_by_finger.pop(event.finger_id, None)
+        if key:
+            key.set_pressed(0)
+
+    def on_scancode_down(self, event):
+        """KEYDOWN event handler."""
+        key = self.layout.get_key(event.unicode or event.key)
+        if key:
+            key.set_pressed(1)
+            self.pressed_by_scancode[event.key] = key
+            self.on_key_down(key)
+            self.on_select(0, 0, key)
+        elif event.key == pygame.K_LEFT and not self.input.selected:
+            self.on_select(0, -1)
+        elif event.key == pygame.K_UP:
+            self.on_select(-1, 0)
+        elif event.key == pygame.K_RIGHT and not self.input.selected:
+            self.on_select(0, 1)
+        elif event.key == pygame.K_DOWN:
+            self.on_select(1, 0)
+        elif event.key == pygame.K_RETURN and self.layout.selection:
+            key = self.layout.selection
+            key.set_pressed(1)
+            self.pressed_by_scancode[event.key] = key
+            self.on_key_down(key)
+
+    def on_scancode_up(self, event):
+        """KEYUP event handler."""
+        key = self.pressed_by_scancode.pop(event.key, None)
+        if key:
+            key.set_pressed(0)
+
+    def on_joyhat(self, event):
+        """JOYHATMOTION event handler."""
+        if event.value == JOYHAT_LEFT and not self.input.selected:
+            self.on_select(0, -1)
+        elif event.value == JOYHAT_UP:
+            self.on_select(-1, 0)
+        elif event.value == JOYHAT_RIGHT and not self.input.selected:
+            self.on_select(0, 1)
+        elif event.value == JOYHAT_DOWN:
+            self.on_select(1, 0)
+
+    def on_joybutton_down(self, event):
+        """JOYBUTTONDOWN event handler."""
+        if event.button == 0 and self.layout.selection:
+            # Select button pressed
+            self.layout.selection.set_pressed(1)
+            self.on_key_down(self.layout.selection)
+
+    def on_joybutton_up(self, event):
+        """JOYBUTTONUP event handler."""
+        if event.button == 0 and self.layout.selection:
+            # Select button released
+            self.layout.selection.set_pressed(0)
+
+    def on_pointer_down(self, position):
+        """Handle a pointer (mouse button or finger) press at the
+        given position.
+
+        Parameters
+        ----------
+        position:
+            Pressed position on the surface.
+
+        Returns
+        -------
+        key:
+            The key pressed at this position, None if it hits nothing.
+        """
+        key = self.layout.get_key_at(position)
+        if key:
+            key.set_pressed(1)
+            self.on_key_down(key)
+            self.on_select(0, 0, key)
+        elif self.input.get_rect().collidepoint(position)\
+                and self.layout.selection:
+            self.layout.selection.set_selected(0)
+            self.layout.selection = None
+            self.input.set_selected(1)
+        return key
 
     def on_select(self, increment_row, increment_col, key=None):
         """"Change the currently selected key.
@@ -785,6 +1023,7 @@ class VKeyboard(object):
         self.uppercase = not self.uppercase
         for layout in self.layouts:
             layout.set_uppercase(self.uppercase)
+            layout.update_action_keys()
 
     def on_special_char(self):
         """Special char key press handler."""
@@ -794,6 +1033,8 @@ class VKeyboard(object):
                 self.set_layout(self.layouts[1])
             else:
                 self.set_layout(self.layouts[0])
+            for layout in self.layouts:
+                layout.update_action_keys()
 
     def on_key_down(self, key):
         """Process key down event by pressing the given key.
@@ -805,10 +1046,10 @@ class VKeyboard(object):
         """
         if isinstance(key, vkeys.VBackKey):
             self.input.delete_at_cursor()
+        elif isinstance(key, vkeys.VActionKey):
+            # Action keys trigger their delegate on release and do not
+            # touch the text buffer, skip the update_buffer round-trip.
+            return
         else:
-            text = key.update_buffer('')
-            if text:
-                self.input.add_at_cursor(text)
-
-        if not isinstance(key, vkeys.VActionKey):
-            self.text_consumer(self.input.text)
+            self.input.add_at_cursor(key.value)
+        self.text_consumer(self.input.text)
@@ -13,8 +13,28 @@ Module for keys definitions. It contains the following classes:
 - `VSpecialCharKey`: change the keyboard layout
 """
 
+import sys
+
 import pygame  # pylint: disable=import-error
 
+try:
+    _intern = sys.intern
+except AttributeError:  # Python 2 exposes intern as a builtin
+    _intern = intern  # noqa: F821 pylint: disable=undefined-variable
+
+
+# Event types a key sprite reacts to, used to skip irrelevant events
+# (mouse motion in particular) with a single membership test.
+HANDLED_EVENT_TYPES = frozenset((
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.FINGERDOWN,
+    pygame.FINGERUP,
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.JOYBUTTONDOWN,
+    pygame.JOYBUTTONUP))
+
 
 class VKey(pygame.sprite.DirtySprite):
     """
@@ -46,18 +66,38 @@ class VKey(pygame.sprite.DirtySprite):
         super(VKey, self).__init__()
         self.pressed = 0
         self.selected = 0
-        self.value = value
+        # Intern the values so equality tests and dict probes against
+        # event characters fast-path on identity. Python 2 unicode
+        # values cannot be interned, keep them as given.
+        if isinstance(value, str):
+            self.value = _intern(value)
+            self.value_uppercase = _intern(value.upper())
+            self.value_lowercase = _intern(value.lower())
+        else:
+            self.value = value
+            self.value_uppercase = value.upper()
+            self.value_lowercase = value.lower()
+        # Digits and symbols are unaffected by the uppercase state
+        self.caseable = self.value_uppercase != self.value_lowercase
+        # Character keys match the event unicode, keys holding a
+        # keycode value (shift) match the event key instead.
+        self.match_unicode = True
+        self.match_key = False
         self.symbol = symbol
+        # Displayed label, kept in sync on state changes so the
+        # renderer reads an attribute instead of calling __str__
+        self.label = symbol if symbol else self.value
         self.rect = pygame.Rect((0, 0), (10, 10))
         self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA, 32)
+        # Backing surface the image is a view of, kept to avoid a new
+        # allocation when the key shrinks during resizes.
+        self._image_store = self.image
         self.renderer = None
         self.pressed_key = None
 
     def __str__(self):
         """Key representation when using str() or print()"""
-        if self.symbol:
-            return self.symbol
-        return self.value
+        return self.label
 
     def set_position(self, x, y):
         """Set the key position.
@@ -85,7 +125,17 @@ class VKey(pygame.sprite.DirtySprite):
         """
         if self.rect.size != (width, height):
             self.rect.size = (width, height)
-            self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA, 32)
+            store_size = self._image_store.get_size()
+            if width <= store_size[0] and height <= store_size[1]:
+                self.image = self._image_store.subsurface(
+                    (0, 0, width, height))
+            else:
+                self._image_store = pygame.Surface(self.rect.size,
+                                                   pygame.SRCALPHA, 32)
+                if pygame.display.get_surface():
+                    # Match the display pixel format for faster blits
+                    self._image_store = self._image_store.convert_alpha()
+                self.image = self._image_store
             self.renderer.draw_key(self.image, self)
             self.dirty = 1
 
@@ -97,12 +147,16 @@ class VKey(pygame.sprite.DirtySprite):
         uppercase:
             True if uppercase, False otherwise.
         """
+        if not self.caseable:
+            return
         if uppercase:
-            new_value = self.value.upper()
+            new_value = self.value_uppercase
         else:
-            new_value = self.value.lower()
+            new_value = self.value_lowercase
         if new_value != self.value:
             self.value = new_value
+            if not self.symbol:
+                self.label = new_value
             self.renderer.draw_key(self.image, self)
             self.dirty = 1
 
@@ -115,8 +169,8 @@ class VKey(pygame.sprite.DirtySprite):
         state:
             New key state.
         """
-        if self.pressed != int(state):
-            self.pressed = int(state)
+        if self.pressed != state:
+            self.pressed = state
             self.renderer.draw_key(self.image, self)
             self.dirty = 1
 
@@ -129,8 +183,8 @@ class VKey(pygame.sprite.DirtySprite):
         state:
             New key state.
         """
-        if self.selected != int(state):
-            self.selected = int(state)
+        if self.selected != state:
+            self.selected = state
             self.renderer.draw_key(self.image, self)
             self.dirty = 1
 
@@ -142,40 +196,47 @@ class VKey(pygame.sprite.DirtySprite):
         events:
             List of events to process.
         """
+        display_size = None
         for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN\
+            event_type = event.type
+            if event_type not in HANDLED_EVENT_TYPES:
+                continue
+            if event_type == pygame.MOUSEBUTTONDOWN\
                     and event.button in (1, 2, 3):
                 # Don't consider the mouse wheel (button 4 & 5):
                 if self.rect.collidepoint(event.pos):
                     self.set_pressed(1)
-            elif event.type == pygame.MOUSEBUTTONUP\
+            elif event_type == pygame.MOUSEBUTTONUP\
                     and event.button in (1, 2, 3):
                 # Don't consider the mouse wheel (button 4 & 5):
                 self.set_pressed(0)
-            elif event.type == pygame.FINGERDOWN:
-                display_size = pygame.display.get_surface().get_size()
+            elif event_type == pygame.FINGERDOWN:
+                if display_size is None:
+                    # Query the display only once per batch
+                    display_size = pygame.display.get_surface().get_size()
                 finger_pos = (event.x * display_size[0], event.y * display_size[1])
                 if self.rect.collidepoint(finger_pos):
                     self.set_pressed(1)
-            elif event.type == pygame.FINGERUP:
+            elif event_type == pygame.FINGERUP:
                 self.set_pressed(0)
-            elif event.type == pygame.KEYDOWN:
-                if event.unicode and event.unicode == self.value:
+            elif event_type == pygame.KEYDOWN:
+                if self.match_unicode and event.unicode\
+                        and event.unicode == self.value:
                     self.set_pressed(1)
                     self.pressed_key = event.key
-                elif event.key == self.value:
+                elif self.match_key and event.key == self.value:
                     self.set_pressed(1)
                     self.pressed_key = event.key
                 elif event.key == pygame.K_RETURN and self.selected:
                     self.set_pressed(1)
                     self.pressed_key = event.key
-            elif event.type == pygame.KEYUP and self.pressed_key is not None:
+            elif event_type == pygame.KEYUP and self.pressed_key is not None:
                 self.set_pressed(0)
                 self.pressed_key = None
-            elif event.type == pygame.JOYBUTTONDOWN and event.button == 0\
+            elif event_type == pygame.JOYBUTTONDOWN and event.button == 0\
                     and self.selected:  # Select button pressed
                 self.set_pressed(1)
-            elif event.type == pygame.JOYBUTTONUP and event.button == 0\
+            elif event_type == pygame.JOYBUTTONUP and event.button == 0\
                     and self.selected:  # Select button released
                 self.set_pressed(0)
 
@@ -278,18 +339,19 @@ class VActionKey(VKey):
         self.activated_symbol = activated_symbol
         self.activated = False
 
-    def __str__(self):
-        """Key representation when using str() or print()"""
-        if self.is_activated():
-            self.activated = True
-            return self.activated_symbol
-        return self.symbol
-
     def update(self, events):
         """Check if state holder has changed."""
         super(VActionKey, self).update(events)
-        if self.activated != self.is_activated() and not self.dirty:
-            self.activated = self.is_activated()
+        self.update_activated()
+
+    def update_activated(self):
+        """Sync the cached activated state with the state holder and
+        redraw the key when it changed.
+        """
+        activated = self.is_activated()
+        if self.activated != activated:
+            self.activated = activated
+            self.label = self.activated_symbol if activated else self.symbol
             self.renderer.draw_key(self.image, self)
             self.dirty = 1
 
@@ -304,6 +366,7 @@ class VActionKey(VKey):
         if prev_state != self.pressed and self.pressed == 0:
             # The key is getting unpressed
             self.action()
+            self.update_activated()
 
     def is_activated(self):
         """Indicates if this key is activated.
@@ -341,6 +404,8 @@ class VUppercaseKey(VActionKey):
                                             u'\u21e7',
                                             u'\u21ea')
         self.value = pygame.K_LSHIFT
+        self.match_unicode = False
+        self.match_key = True
 
     def is_activated(self):
         """Indicates if this key is activated.
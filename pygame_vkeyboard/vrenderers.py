@@ -6,17 +6,58 @@ Renderer for the keyboard and the text box used to display
 the current text.
 """
 
+import io
 import os.path as osp
 import pygame  # pylint: disable=import-error
 
 from . import vkeys
 
 
+# Fitted fonts indexed by (font_name, max_height), a keyboard only
+# uses a couple of heights so the cache stays tiny.
+_FIT_FONT_CACHE = {}
+
+# Ensure a large panel of characters heights
+_FIT_FONT_TEXT = "?/|!()§&@0123456789azertyuiopqsdfghjklmwxcvbnAZERTYUIOPQSDFGHJKLMWXCVBN"  # noqa
+
+# Raw font file content indexed by path, to parse the file only once
+_FONT_BYTES = {}
+
+
+def _load_font(font_name, size):
+    """Build a font of the given size from cached file bytes.
+
+    Opening a font goes through a full file parse: keeping the raw
+    bytes in memory makes the repeated constructions of the fitting
+    search considerably cheaper.
+
+    Parameters
+    ----------
+    font_name:
+        Path to font file.
+    size:
+        Point size of the font.
+    """
+    if font_name is None:
+        # pygame resolves None to its bundled default font.
+        return pygame.font.Font(None, size)
+    data = _FONT_BYTES.get(font_name)
+    if data is None:
+        with open(font_name, 'rb') as font_file:
+            data = font_file.read()
+        _FONT_BYTES[font_name] = data
+    return pygame.font.Font(io.BytesIO(data), size)
+
+
 def fit_font(font_name, max_height):
     """Set the size of the font to fit the given height.
 
     This function uses the binary search algorithm to go faster
-    than a one-by-one try.
+    than a one-by-one try. For TrueType fonts the rendered height
+    stays close to the point size, so the search starts from a
+    tight band around the target instead of [0, 2 * max_height],
+    widened only for fonts with unusual metrics. Results are
+    cached so resizing back to an already fitted height is free.
 
     Parameters
     ----------
@@ -25,17 +66,33 @@ def fit_font(font_name, max_height):
     max_height:
         Height to fit.
     """
-    font = pygame.font.Font(font_name, 1)
-
-    # Ensure a large panel of characters heights
-    text = "?/|!()§&@0123456789azertyuiopqsdfghjklmwxcvbnAZERTYUIOPQSDFGHJKLMWXCVBN"  # noqa
-
-    start = 1
-    end = max_height * 2
+    font = _FIT_FONT_CACHE.get((font_name, max_height))
+    if font is not None:
+        return font
+
+    text = _FIT_FONT_TEXT
+
+    start = max(1, max_height // 2)
+    end = max_height + max(4, max_height // 8)
+
+    # Widen the band when the font metrics fall outside of it
+    font = _load_font(font_name, end)
+    while font.size(text)[1] <= max_height:
+        start = end
+        end *= 2
+        del font
+        font = _load_font(font_name, end)
+    while start > 1:
+        del font
+        font = _load_font(font_name, start)
+        if font.size(text)[1] <= max_height:
+            break
+        end = start
+        start = max(1, start // 2)
 
     while start < end:
         k = (start + end) // 2
-        font = pygame.font.Font(font_name, k)
+        font = _load_font(font_name, k)
         height = font.size(text)[1]
         if height > max_height:
             end = k
@@ -45,9 +102,26 @@ def fit_font(font_name, max_height):
             # Run garbage collector, to avoid opening too many files
             del font
 
+    if font.size(text)[1] > max_height and start > 1:
+        # The search ended on an overshooting probe: the largest
+        # fitting size is one step below
+        del font
+        font = _load_font(font_name, start - 1)
+
+    _FIT_FONT_CACHE[(font_name, max_height)] = font
     return font
 
 
+# Composited rounded rectangles indexed by (size, color, radius,
+# width): a keyboard only combines a few sizes and colors, so the
+# shapes are rebuilt once and blitted ever after.
+_ROUND_RECT_CACHE = {}
+
+# Smoothscaled corner ellipses indexed by (side, radius), shared by
+# the filled shapes of every color using the same corner geometry.
+_ROUND_CORNER_CACHE = {}
+
+
 def draw_round_rect(surface, color, rect, radius=0.1, width=0):
     """Draw a rounded rectangle.
 
@@ -66,6 +140,11 @@ def draw_round_rect(surface, color, rect, radius=0.1, width=0):
         Line thickness (0 to fill the rectangle).
     """
     rect = pygame.Rect(rect)
+
+    cache_key = (rect.size, tuple(color), radius, width)
+    shape = _ROUND_RECT_CACHE.get(cache_key)
+    if shape is not None:
+        return surface.blit(shape, rect)
     if len(color) == 4:
         alpha = color[-1]
         color = color[:3] + (0,)
@@ -75,14 +154,23 @@ def draw_round_rect(surface, color, rect, radius=0.1, width=0):
 
     shape = pygame.Surface(rect.size, pygame.SRCALPHA)
 
-    circle = pygame.Surface([min(rect.size) * 3] * 2, pygame.SRCALPHA)
+    side = min(rect.size)
     if width > 0:
+        circle = pygame.Surface([side * 3] * 2, pygame.SRCALPHA)
         pygame.draw.arc(circle, (0, 0, 0), circle.get_rect(),
                         1.571, 3.1415, width * 8)
+        circle = pygame.transform.smoothscale(circle,
+                                              [int(side * radius)] * 2)
     else:
-        pygame.draw.ellipse(circle, (0, 0, 0), circle.get_rect(), 0)
-    circle = pygame.transform.smoothscale(circle,
-                                          [int(min(rect.size) * radius)] * 2)
+        # The filled corner only depends on its geometry, share the
+        # rasterized ellipse between shapes of different colors
+        circle = _ROUND_CORNER_CACHE.get((side, radius))
+        if circle is None:
+            circle = pygame.Surface([side * 3] * 2, pygame.SRCALPHA)
+            pygame.draw.ellipse(circle, (0, 0, 0), circle.get_rect(), 0)
+            circle = pygame.transform.smoothscale(circle,
+                                                  [int(side * radius)] * 2)
+            _ROUND_CORNER_CACHE[(side, radius)] = circle
 
     i = 1
     shape_rect = shape.get_rect()
@@ -111,6 +199,14 @@ def draw_round_rect(surface, color, rect, radius=0.1, width=0):
     shape.fill(color, special_flags=pygame.BLEND_RGBA_MAX)
     shape.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MIN)
 
+    if pygame.display.get_surface():
+        # Match the display pixel format for faster blits
+        shape = shape.convert_alpha()
+
+    if len(_ROUND_RECT_CACHE) > 64:
+        _ROUND_RECT_CACHE.clear()
+    _ROUND_RECT_CACHE[cache_key] = shape
+
     return surface.blit(shape, rect)
 
 
@@ -128,6 +224,22 @@ class VKeyboardRenderer(object):
     DEFAULT = None
     DARK = None
 
+    __slots__ = ('font', 'font_height', 'glyph_cache', 'key_cache',
+                 'font_input', 'font_input_height', 'width_cache',
+                 'advance_cache', 'text_cache', 'font_name', 'text_color',
+                 'cursor_color', 'selection_color', 'background_color',
+                 'background_key_color', 'background_input_color',
+                 'text_special_key_color', 'background_special_key_color')
+
+    # Key type to drawing method name, resolved on the instance so
+    # renderer subclasses overriding a drawing method keep working.
+    DRAW_HANDLERS = {
+        vkeys.VSpaceKey: 'draw_space_key',
+        vkeys.VBackKey: 'draw_back_key',
+        vkeys.VUppercaseKey: 'draw_uppercase_key',
+        vkeys.VSpecialCharKey: 'draw_special_char_key',
+    }
+
     def __init__(self,
                  font_name,
                  text_color,
@@ -167,8 +279,13 @@ class VKeyboardRenderer(object):
         """
         self.font = None
         self.font_height = None
+        self.glyph_cache = {}
+        self.key_cache = {}
         self.font_input = None
         self.font_input_height = None
+        self.width_cache = {}
+        self.advance_cache = {}
+        self.text_cache = {}
         self.font_name = font_name
         self.text_color = text_color
         self.cursor_color = cursor_color
@@ -180,22 +297,59 @@ class VKeyboardRenderer(object):
         self.text_special_key_color = text_special_key_color
         self.background_special_key_color = background_special_key_color
 
+    def get_glyph(self, text, color):
+        """Return the rendered surface for the given text and color.
+
+        Rasterizing a glyph is the dominant cost when redrawing a key,
+        and keys toggle between the same few (text, color) couples, so
+        the rendered surfaces are memoized. The cache is flushed when
+        the key font is resized.
+
+        Parameters
+        ----------
+        text:
+            Text to render.
+        color:
+            RGB tuple of the text color.
+        """
+        glyph = self.glyph_cache.get((text, color))
+        if glyph is None:
+            glyph = self.font.render(text, 1, color)
+            if pygame.display.get_surface():
+                # Match the display pixel format for faster blits
+                glyph = glyph.convert_alpha()
+            self.glyph_cache[(text, color)] = glyph
+        return glyph
+
     def get_text_width(self, text):
         """Return the width of the given text in the text input box.
 
+        Measures are memoized: truncating while typing measures the
+        same prefixes over and over. The cache is flushed when the
+        input font is resized.
+
         Parameters
         ----------
         text:
             Text to evaluate.
         """
-        return self.font_input.size(text)[0]
+        width = self.width_cache.get(text)
+        if width is None:
+            if len(self.width_cache) > 2048:
+                self.width_cache.clear()
+            width = self.font_input.size(text)[0]
+            self.width_cache[text] = width
+        return width
 
     def truncate(self, text, max_width, start=0, nearest=False):
         """Truncate the given text in order to fit the maximum
         given width.
 
-        This function uses the binary search algorithm to go faster
-        than a one-by-one try.
+        The cut position is located by accumulating per-character
+        advances, cached forever, so no full-prefix measure runs
+        during the scan. As advances ignore kerning, the candidate
+        position is then settled with a couple of exact (memoized)
+        measures.
 
         Parameters
         ----------
@@ -214,27 +368,55 @@ class VKeyboardRenderer(object):
         (part, width):
             Truncated text and its rendered width.
         """
-        width = 0
         end = len(text)
 
         if end < start:
             return text, self.get_text_width(text)
 
-        while start < end:
-            k = (start + end) // 2
-            new_width = self.get_text_width(text[:k+1])
-            if new_width > max_width:
-                end = k
-            else:
-                width = new_width
-                start = k + 1
-
-        if nearest:
-            next_width = self.get_text_width(text[:start+1])
+        # Most of the time the text already fits: answer with a single
+        # memoized measure before scanning for a cut position
+        width = self.get_text_width(text)
+        if width <= max_width:
+            return text, width
+
+        advances = self.advance_cache
+        unknown = [char for char in dict.fromkeys(text)
+                   if char not in advances]
+        if unknown:
+            # One metrics call resolves every new character at once
+            metrics = self.font_input.metrics(''.join(unknown))
+            for char, metric in zip(unknown, metrics):
+                if metric:
+                    advances[char] = metric[4]
+                else:
+                    advances[char] = self.font_input.size(char)[0]
+
+        width = self.get_text_width(text[:start]) if start else 0
+        k = start
+        while k < end:
+            if width + advances[text[k]] > max_width:
+                break
+            width += advances[text[k]]
+            k += 1
+
+        # Settle the exact cut around the candidate position
+        width = self.get_text_width(text[:k])
+        while k > start and width > max_width:
+            k -= 1
+            width = self.get_text_width(text[:k])
+        while k < end:
+            next_width = self.get_text_width(text[:k+1])
+            if next_width > max_width:
+                break
+            width = next_width
+            k += 1
+
+        if nearest and k < end:
+            next_width = self.get_text_width(text[:k+1])
             if abs(max_width - next_width) < abs(max_width - width):
-                return text[:start+1], next_width
+                return text[:k+1], next_width
 
-        return text[:start], width
+        return text[:k], width
 
     def draw_background(self, surface):
         """Default drawing method for background.
@@ -283,10 +465,23 @@ class VKeyboardRenderer(object):
             # Resize font to fit the surface
             self.font_input = fit_font(self.font_name, surface.get_height())
             self.font_input_height = surface.get_height()
+            self.width_cache.clear()
+            self.advance_cache.clear()
+
+        # Lines get redrawn with the same text on cursor movements and
+        # scrolling: reuse the rendered surface when nothing changed
+        cache_key = (self.font_input_height, text)
+        rendered = self.text_cache.get(cache_key)
+        if rendered is None:
+            if len(self.text_cache) > 256:
+                self.text_cache.clear()
+            rendered = self.font_input.render(text, 1, self.text_color[0])
+            if pygame.display.get_surface():
+                rendered = rendered.convert_alpha()
+            self.text_cache[cache_key] = rendered
 
         surface.fill(self.background_input_color)
-        surface.blit(self.font_input.render(text, 1,
-                                            self.text_color[0]), (0, 0))
+        surface.blit(rendered, (0, 0))
 
     def draw_key(self, surface, key):
         """Default drawing method for key.
@@ -300,16 +495,8 @@ class VKeyboardRenderer(object):
         key:
             Target key to be drawn.
         """
-        if isinstance(key, vkeys.VSpaceKey):
-            self.draw_space_key(surface, key)
-        elif isinstance(key, vkeys.VBackKey):
-            self.draw_back_key(surface, key)
-        elif isinstance(key, vkeys.VUppercaseKey):
-            self.draw_uppercase_key(surface, key)
-        elif isinstance(key, vkeys.VSpecialCharKey):
-            self.draw_special_char_key(surface, key)
-        else:
-            self.draw_character_key(surface, key)
+        handler = self.DRAW_HANDLERS.get(type(key), 'draw_character_key')
+        getattr(self, handler)(surface, key)
 
     def draw_character_key(self, surface, key, special=False):
         """Default drawing method for key.
@@ -328,11 +515,13 @@ class VKeyboardRenderer(object):
             Boolean flag that indicates if the drawn key should use
             special background color if available.
         """
-        rect = surface.get_rect().inflate(-2, -2)
-        if self.font_height != rect.height:
+        height = surface.get_height() - 2
+        if self.font_height != height:
             # Resize font to fit the surface
-            self.font = fit_font(self.font_name, rect.height)
-            self.font_height = rect.height
+            self.font = fit_font(self.font_name, height)
+            self.font_height = height
+            self.glyph_cache.clear()
+            self.key_cache.clear()
 
         background_color = self.background_key_color[key.pressed]
         if special and self.background_special_key_color:
@@ -344,16 +533,31 @@ class VKeyboardRenderer(object):
             state = getattr(key, 'activated', key.pressed)
             text_color = self.text_special_key_color[state]
 
+        # A key is fully described by its label, colors, selection
+        # border and size: reuse the composited surface when the same
+        # visual state already got drawn (e.g. press/release cycles).
+        cache_key = (key.label, background_color, text_color,
+                     key.selected, surface.get_size())
+        cached = self.key_cache.get(cache_key)
+        if cached is not None:
+            surface.blit(cached, (0, 0))
+            return
+
+        rect = surface.get_rect().inflate(-2, -2)
         surface.fill(self.background_color)
         draw_round_rect(surface, background_color, rect, 0.4)
         if key.selected:
             draw_round_rect(surface, self.selection_color, surface.get_rect(), 0.4, 1)
 
-        text = self.font.render(str(key), 1, text_color)
+        text = self.get_glyph(key.label, text_color)
         x = (key.rect.width - text.get_width()) // 2
         y = (key.rect.height - text.get_height()) // 2
         surface.blit(text, (x, y))
 
+        if len(self.key_cache) > 512:
+            self.key_cache.clear()
+        self.key_cache[cache_key] = surface.copy()
+
     def draw_space_key(self, surface, key):
         """Default drawing method space key.
 
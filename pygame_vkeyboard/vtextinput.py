@@ -11,6 +11,23 @@ import pygame  # pylint: disable=import-error
 from .vrenderers import VKeyboardRenderer
 
 
+def _build_surface(size):
+    """Build a sprite image surface of the given size.
+
+    The surface is converted to the display pixel format when a
+    display exists, so group draws take the fast blit path.
+
+    Parameters
+    ----------
+    size:
+        Size tuple (width, height) of the surface.
+    """
+    surface = pygame.Surface(size, pygame.SRCALPHA, 32)
+    if pygame.display.get_surface():
+        surface = surface.convert_alpha()
+    return surface
+
+
 class VBackground(pygame.sprite.DirtySprite):
     """Background of the text input box. It is used to create
     borders by making its size a litle bit larger than the
@@ -29,7 +46,10 @@ class VBackground(pygame.sprite.DirtySprite):
         """
         super(VBackground, self).__init__()
         self.renderer = renderer
-        self.image = pygame.Surface(size, pygame.SRCALPHA, 32)
+        self.image = _build_surface(size)
+        # Backing surface the image is a view of, kept to avoid a new
+        # allocation when the background shrinks (grows back a line)
+        self._image_store = self.image
         self.rect = pygame.Rect((0, 0), size)
 
         self.renderer.draw_background(self.image)
@@ -53,7 +73,13 @@ class VBackground(pygame.sprite.DirtySprite):
             self.dirty = 1
         if self.rect.size != (width, height):
             self.rect.size = (width, height)
-            self.image = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+            store_size = self._image_store.get_size()
+            if width <= store_size[0] and height <= store_size[1]:
+                self.image = self._image_store.subsurface(
+                    (0, 0, width, height))
+            else:
+                self._image_store = _build_surface((width, height))
+                self.image = self._image_store
             self.renderer.draw_background(self.image)
             self.dirty = 1
 
@@ -77,15 +103,15 @@ class VCursor(pygame.sprite.DirtySprite):
         """
         super(VCursor, self).__init__()
         self.renderer = renderer
-        self.image = pygame.Surface(size, pygame.SRCALPHA, 32)
+        self.image = _build_surface(size)
         self.rect = self.image.get_rect()
         self.index = 0
         self.selected = 0
 
         # Blink management
-        self.clock = pygame.time.Clock()
         self.switch_ms = 400
         self.switch_counter = 0
+        self.last_tick = pygame.time.get_ticks()
 
         self.renderer.draw_cursor(self.image, self)
 
@@ -113,7 +139,7 @@ class VCursor(pygame.sprite.DirtySprite):
         """
         if self.rect.size != (width, height):
             self.rect.size = (width, height)
-            self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA, 32)
+            self.image = _build_surface(self.rect.size)
             self.renderer.draw_cursor(self.image, self)
             self.dirty = 1
 
@@ -145,8 +171,9 @@ class VCursor(pygame.sprite.DirtySprite):
 
     def update(self, events):
         """Toggle visibility of the cursor."""
-        self.clock.tick()
-        self.switch_counter += self.clock.get_time()
+        now = pygame.time.get_ticks()
+        self.switch_counter += now - self.last_tick
+        self.last_tick = now
         if self.switch_counter >= self.switch_ms:
             self.switch_counter %= self.switch_ms
             self.visible = int(not self.visible)
@@ -175,7 +202,8 @@ class VLine(pygame.sprite.DirtySprite):
         """
         super(VLine, self).__init__()
         self.renderer = renderer
-        self.image = pygame.Surface(size, pygame.SRCALPHA, 32)
+        self.image = _build_surface(size)
+        self._image_store = self.image
         self.rect = pygame.Rect((0, 0), size)
         self.text = ''
         self.full = False
@@ -211,7 +239,13 @@ class VLine(pygame.sprite.DirtySprite):
         """
         if self.rect.size != (width, height):
             self.rect.size = (width, height)
-            self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA, 32)
+            store_size = self._image_store.get_size()
+            if width <= store_size[0] and height <= store_size[1]:
+                self.image = self._image_store.subsurface(
+                    (0, 0, width, height))
+            else:
+                self._image_store = _build_surface(self.rect.size)
+                self.image = self._image_store
             self.renderer.draw_text(self.image, self.text)
             self.dirty = 1
 
@@ -244,6 +278,9 @@ class VLine(pygame.sprite.DirtySprite):
         if not text:
             return self.clear()
         elif self.text:
+            if text == self.text:
+                # Nothing changed on this line, keep the drawn image
+                return ''
             if text.startswith(self.text):
                 if self.full:
                     return text[len(self.text):]
@@ -290,7 +327,10 @@ class VTextInput(object):
         self.selected = 0
         self.position = position
         self.size = size  # One ligne size
-        self.text = ''
+        # Characters are kept in a list so edits at the cursor are
+        # in-place moves; the joined string is memoized on read
+        self._chars = []
+        self._text = ''
         self.text_margin = border
         self.renderer = renderer
 
@@ -312,10 +352,31 @@ class VTextInput(object):
 
         self.set_line_rect(*self.position + self.size)
 
+    @property
+    def text(self):
+        """Current text of the input box."""
+        if self._text is None:
+            self._text = ''.join(self._chars)
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._chars = list(value)
+        self._text = value
+
     def set_eraser(self, surface):
         """Setup the surface used to hide/clear the text input.
+
+        Only the clipped area the sprites can touch is copied; the
+        eraser keeps the full surface size so the group can blit it
+        back with matching coordinates.
         """
-        self.eraser = surface.copy()
+        clip = self.sprites.get_clip()
+        if clip is not None and clip != surface.get_rect():
+            self.eraser = pygame.Surface(surface.get_size())
+            self.eraser.blit(surface, clip, clip)
+        else:
+            self.eraser = surface.copy()
         self.sprites.clear(surface, self.eraser)
 
     def enable(self):
@@ -424,28 +485,33 @@ class VTextInput(object):
         events:
             List of events to process.
         """
-        if self.state == 1:
-            self.sprites.update(events)
-            for event in events:
-                if event.type == pygame.KEYUP and self.cursor.selected:
-                    if event.key == pygame.K_LEFT:
-                        self.increment_cursor(-1)
-                    elif event.key == pygame.K_RIGHT:
-                        self.increment_cursor(1)
-                    elif event.key == pygame.K_HOME:
-                        self.cursor.index = 0
-                        self.increment_cursor(0)
-                    elif event.key == pygame.K_END:
-                        self.cursor.index = 0
-                        self.increment_cursor(len(self.text))
-                if event.type == pygame.MOUSEBUTTONDOWN\
-                        and event.button in (1, 2, 3):
-                    # Don't consider the mouse wheel (button 4 & 5):
-                    self.set_cursor(event.pos)
-                if event.type == pygame.FINGERDOWN:
+        if self.state == 0:
+            # Disabled input: no sprite is visible, nothing to do
+            return
+        self.sprites.update(events)
+        display_size = None
+        for event in events:
+            if event.type == pygame.KEYUP and self.cursor.selected:
+                if event.key == pygame.K_LEFT:
+                    self.increment_cursor(-1)
+                elif event.key == pygame.K_RIGHT:
+                    self.increment_cursor(1)
+                elif event.key == pygame.K_HOME:
+                    self.cursor.index = 0
+                    self.increment_cursor(0)
+                elif event.key == pygame.K_END:
+                    self.cursor.index = 0
+                    self.increment_cursor(len(self.text))
+            if event.type == pygame.MOUSEBUTTONDOWN\
+                    and event.button in (1, 2, 3):
+                # Don't consider the mouse wheel (button 4 & 5):
+                self.set_cursor(event.pos)
+            if event.type == pygame.FINGERDOWN:
+                if display_size is None:
+                    # Query the display only once per batch
                     display_size = pygame.display.get_surface().get_size()
-                    finger_pos = (event.x * display_size[0], event.y * display_size[1])
-                    self.set_cursor(finger_pos)
+                finger_pos = (event.x * display_size[0], event.y * display_size[1])
+                self.set_cursor(finger_pos)
 
     def update_lines(self):
         """Update lines content with the current text."""
@@ -499,13 +565,13 @@ class VTextInput(object):
         text:
             Single char or text to append.
         """
-        if self.cursor.index < len(self.text):
+        index = self.cursor.index
+        if index < len(self._chars):
             # Inserting in the text
-            prefix = self.text[:self.cursor.index]
-            suffix = self.text[self.cursor.index:]
-            self.text = prefix + text + suffix
+            self._chars[index:index] = text
         else:
-            self.text += text
+            self._chars.extend(text)
+        self._text = None
         self.update_lines()
         self.increment_cursor(1)
 
@@ -513,9 +579,8 @@ class VTextInput(object):
         """Delete a character before the cursor position."""
         if self.cursor.index == 0:
             return
-        prefix = self.text[:self.cursor.index - 1]
-        suffix = self.text[self.cursor.index:]
-        self.text = prefix + suffix
+        del self._chars[self.cursor.index - 1]
+        self._text = None
         self.update_lines()
         self.increment_cursor(-1)
 
@@ -529,7 +594,7 @@ class VTextInput(object):
             From how many characters the cursor shall move.
         """
         pos = max(0, self.cursor.index + step)
-        self.cursor.set_index(min(pos, len(self.text)))
+        self.cursor.set_index(min(pos, len(self._chars)))
 
         # Update cursor position
         chars_counter = 0
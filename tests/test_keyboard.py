@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# coding: utf8
+
+import pygame
+import pygame_vkeyboard as vkboard
+
+
+def test_disable_enable_roundtrip():
+    """Hide then show the keyboard, the surface shall be restored."""
+    pygame.init()
+    screen = pygame.display.set_mode((400, 300))
+    app_color = (42, 84, 126)
+    screen.fill(app_color)
+
+    layout = vkboard.VKeyboardLayout(vkboard.VKeyboardLayout.AZERTY)
+    keyboard = vkboard.VKeyboard(screen, lambda text: None, layout,
+                                 show_text=False)
+    keyboard.draw(screen)
+    shown = screen.copy()
+
+    # Hiding the keyboard shall blank it back to the application surface
+    keyboard.disable()
+    keyboard.draw(screen)
+    blank = pygame.Surface(screen.get_size())
+    blank.fill(app_color)
+    assert pygame.image.tobytes(screen, 'RGB')\
+        == pygame.image.tobytes(blank, 'RGB')
+
+    # Showing it again shall restore the exact previous frame
+    keyboard.enable()
+    keyboard.draw(screen)
+    assert pygame.image.tobytes(screen, 'RGB')\
+        == pygame.image.tobytes(shown, 'RGB')